@@ -20,14 +20,30 @@
 
 """Auxiliary calculations for SecretShare."""
 
-from functools import reduce
-from math import ceil, log2
-from operator import mul
-from typing import Iterator, List, Sequence, Tuple
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import gmpy2
+except ImportError:  # gmpy2 is optional: it only speeds up big integer math
+    gmpy2 = None
 
 # This file is largely based on
 # https://en.wikipedia.org/wiki/Shamir's_Secret_Sharing#Python_example
 
+# Python 3.8+ can compute modular inverses natively with pow(x, -1, m)
+try:
+    pow(2, -1, 3)
+except ValueError:
+    _HAS_POW_INVERSE = False
+else:
+    _HAS_POW_INVERSE = True
+
+# Finite differences only pay off when evaluating at least this many points
+# per coefficient: below it, Horner's rule is as fast or faster (measured for
+# every prime size). gmpy2 makes multiplications cheap, moving the crossover up
+_FINITE_DIFFERENCES_MIN_RATIO = 4 if gmpy2 else 2
+
 
 def compute_closest_bigger_equal_pow2(value: int) -> int:
     """Calculate the closest power of 2 bigger than or equal to given value."""
@@ -38,11 +54,14 @@ def compute_closest_bigger_equal_pow2(value: int) -> int:
 
     if value < 3:
         return 2
-    return 2 ** ceil(log2(value))
+    return 1 << (value - 1).bit_length()
 
 
 def eval_poly_at_point(poly: Sequence[int], point: int, prime: int) -> int:
-    """Evaluate polynomial (coefficient tuple) at given point."""
+    """Evaluate polynomial (coefficient sequence) at given point.
+
+    The coefficients can be given as any sequence, such as a list or a tuple.
+    """
     if not isinstance(point, int) or not isinstance(prime, int):
         raise TypeError('point and prime must be integers')
     if not isinstance(poly, Sequence):
@@ -50,12 +69,111 @@ def eval_poly_at_point(poly: Sequence[int], point: int, prime: int) -> int:
     if prime < 2:
         raise ValueError('prime must be positive and prime')
 
+    if gmpy2:
+        point, prime = gmpy2.mpz(point), gmpy2.mpz(prime)
+        poly = [gmpy2.mpz(coeff) for coeff in poly]
+
     accum = 0
     for coeff in reversed(poly):
-        accum *= point
-        accum += coeff
-        accum %= prime
-    return accum
+        accum = (accum * point + coeff) % prime
+    return int(accum)
+
+
+def eval_poly_at_points(poly: Sequence[int], points: Sequence[int],
+                        prime: int) -> List[int]:
+    """Evaluate polynomial (coefficient sequence) at every given point.
+
+    The result is the same as calling `eval_poly_at_point` for each point, but
+    arguments are validated and converted only once for all of them.
+    """
+    if not isinstance(prime, int):
+        raise TypeError('prime must be integer')
+    if not isinstance(poly, Sequence) or not isinstance(points, Sequence):
+        raise TypeError('poly and points must be sequences of integers')
+    if prime < 2:
+        raise ValueError('prime must be positive and prime')
+
+    if gmpy2:
+        prime = gmpy2.mpz(prime)
+        poly = [gmpy2.mpz(coeff) for coeff in poly]
+
+    return [int(value) for value in _horner_at_points(poly, points, prime)]
+
+
+def _horner_at_points(poly: Sequence[int], points: Iterable[int],
+                      prime: int) -> List[int]:
+    """Evaluate polynomial at every given point with Horner's rule.
+
+    Arguments are not validated nor converted, and values are returned as
+    computed (mpz if the coefficients are).
+    """
+    # Points are small, so each step multiplies a big number by a small one
+    coeffs = poly[::-1]
+    values = []
+    for point in points:
+        accum = 0
+        for coeff in coeffs:
+            accum = (accum * point + coeff) % prime
+        values.append(accum)
+    return values
+
+
+def eval_poly_at_range(poly: Sequence[int], count: int, prime: int) -> List[int]:
+    """Evaluate polynomial (coefficient sequence) at points 1, 2, ..., count.
+
+    For many points, the first len(poly) are evaluated with Horner's rule, and
+    the rest are obtained with the method of finite differences, where each
+    point costs one addition per degree instead of a multiplication and a
+    reduction. For a few points, building the differences costs more than it
+    saves, so they are all evaluated with Horner's rule.
+    """
+    return list(iter_poly_at_range(poly, count, prime))
+
+
+def iter_poly_at_range(poly: Sequence[int], count: int,
+                       prime: int) -> Iterator[int]:
+    """Lazily evaluate polynomial (coefficient sequence) at points 1, ..., count.
+
+    Same as `eval_poly_at_range`, but values are yielded as they are computed,
+    keeping only len(poly) values in memory.
+    """
+    if not isinstance(count, int) or not isinstance(prime, int):
+        raise TypeError('count and prime must be integers')
+    if not isinstance(poly, Sequence):
+        raise TypeError('poly must be a sequence of integers')
+    if count < 0:
+        raise ValueError('count must be positive')
+    if prime < 2:
+        raise ValueError('prime must be positive and prime')
+
+    if count < _FINITE_DIFFERENCES_MIN_RATIO * len(poly) or not poly:
+        return iter(eval_poly_at_points(poly, range(1, count + 1), prime))
+    return _iter_poly_at_range(poly, count, prime)
+
+
+def _iter_poly_at_range(poly: Sequence[int], count: int,
+                        prime: int) -> Iterator[int]:
+    """Yield the values of `iter_poly_at_range` using finite differences."""
+    degree = len(poly) - 1
+    if gmpy2:
+        prime = gmpy2.mpz(prime)
+        poly = [gmpy2.mpz(coeff) for coeff in poly]
+    values = _horner_at_points(poly, range(1, degree + 2), prime)
+    for value in values:
+        yield int(value)
+
+    # Last difference of every order, from the values computed so far
+    diffs = [values[-1]]
+    row = values
+    for _ in range(degree):
+        row = [(right - left) % prime for left, right in zip(row, row[1:])]
+        diffs.append(row[-1])
+
+    for _ in range(count - degree - 1):
+        for order in range(degree - 1, -1, -1):
+            value = diffs[order] + diffs[order + 1]
+            diffs[order] = value - prime if value >= prime else value
+        yield int(diffs[0])
 
 
 def int_to_bytes(num: int) -> bytes:
@@ -63,7 +181,7 @@ def int_to_bytes(num: int) -> bytes:
     if not isinstance(num, int):
         raise TypeError('num_value must be integer')
     signed = num < 0
-    length = ceil(num.bit_length() / 8) or 1  # For 0, bit_length is 0
+    length = (num.bit_length() + 7) >> 3 or 1  # For 0, bit_length is 0
     return num.to_bytes(length, 'big', signed=signed)
 
 
@@ -91,11 +209,6 @@ def _extended_gcd(a: int, b: int) -> Tuple[int, int]:
     be computed via extended Euclidean algorithm
     http://en.wikipedia.org/wiki/Modular_multiplicative_inverse#Computation
     """
-    if not isinstance(a, int) or not isinstance(b, int):
-        raise TypeError('a and b must be integers')
-    # if a < 0 or b < 0:
-    #     raise ValueError('a and b must be bigger than 0')
-
     x = 0
     last_x = 1
     y = 1
@@ -108,26 +221,84 @@ def _extended_gcd(a: int, b: int) -> Tuple[int, int]:
     return last_x, last_y
 
 
-def _divmod(num: int, den: int, prime: int) -> int:
-    """Compute integer division modulo prime.
+def _modinv(num: int, prime: int) -> int:
+    """Compute the modular multiplicative inverse of num modulo prime.
 
-    The return value will be such that the following is true:
-    den * _divmod(num, den, p) % p == num
+    Arguments are not validated: this is an internal helper for the hot path,
+    and callers must ensure they are integers and that prime is prime.
     """
-    if not isinstance(num, int) \
-            or not isinstance(den, int) \
-            or not isinstance(prime, int):
-        raise TypeError('num, den and prime must be integers')
-    if prime < 2:
-        raise ValueError('prime must be positive and prime')
+    if gmpy2:
+        return gmpy2.invert(num, prime)
+    if _HAS_POW_INVERSE:
+        return pow(num, -1, prime)
+    inv, _ = _extended_gcd(num, prime)
+    return inv % prime
+
 
-    inv, _ = _extended_gcd(den, prime)
-    return num * inv
+def _batch_modinv(values: Sequence[int], prime: int) -> List[int]:
+    """Compute the inverses of all values modulo prime with a single inversion.
+
+    Uses Montgomery's trick: invert the product of all values, then recover
+    each inverse multiplying by the products of the other values.
+    Arguments are not validated, as in `_modinv`.
+    """
+    prefixes = []  # product of the values before each one
+    accum = 1
+    for value in values:
+        prefixes.append(accum)
+        accum = accum * value % prime
 
+    inv = _modinv(accum, prime)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        inverses[i] = inv * prefixes[i] % prime
+        inv = inv * values[i] % prime
+    return inverses
 
-def _product(values: Iterator[int]) -> int:
-    """Compute the product over the given values."""
-    return reduce(mul, values, 1)
+
+def _product(values: Iterator[int], prime: Optional[int] = None) -> int:
+    """Compute the product over the given values, optionally modulo prime.
+
+    Reducing on every step keeps the operands bounded by the prime size.
+    """
+    accum = 1
+    if prime is None:
+        for value in values:
+            accum *= value
+    else:
+        for value in values:
+            accum = accum * value % prime
+    return accum
+
+
+@lru_cache(maxsize=32)
+def _lagrange_inverse_denominators(x_s: Tuple[int, ...],
+                                   prime: int) -> Tuple[int, ...]:
+    """Compute the inverse of the Lagrange basis denominators modulo prime.
+
+    They only depend on the points, so they are cached to be reused when
+    interpolating several times over the same set of points.
+    """
+    k = len(x_s)
+    dens = [_product((x_s[i] - x_s[j] for j in range(k) if j != i), prime)
+            for i in range(k)]
+    return tuple(_batch_modinv(dens, prime))
+
+
+@lru_cache(maxsize=32)
+def _lagrange_basis_at_zero(x_s: Tuple[int, ...], prime: int) -> Tuple[int, ...]:
+    """Compute the Lagrange basis polynomials evaluated at 0 modulo prime.
+
+    Interpolating at 0 is how a secret is recovered, and the basis only depends
+    on the points, so it is cached to be reused for the same set of points.
+    """
+    k = len(x_s)
+    inv_dens = _lagrange_inverse_denominators(x_s, prime)
+    return tuple(
+        _product((-x_s[j] for j in range(k) if j != i), prime) * inv_dens[i]
+        % prime
+        for i in range(k)
+    )
 
 
 def lagrange_interpolate(x: int, x_s: List[int], y_s: List[int], prime: int) -> int:
@@ -142,16 +313,27 @@ def lagrange_interpolate(x: int, x_s: List[int], y_s: List[int], prime: int) ->
     if prime < 2:
         raise ValueError('prime must be positive and prime')
 
+    if gmpy2:
+        x, prime = gmpy2.mpz(x), gmpy2.mpz(prime)
+        x_s = [gmpy2.mpz(x_i) for x_i in x_s]
+        y_s = [gmpy2.mpz(y_i) for y_i in y_s]
+
     k = len(x_s)
     assert k == len(set(x_s)), 'x_s points must be distinct'
-    nums = []  # avoid inexact division
-    dens = []
-    for i in range(k):
-        others = list(x_s)
-        cur = others.pop(i)
-        nums.append(_product(x - o for o in others))
-        dens.append(_product(cur - o for o in others))
-    den = _product(dens)
-    num = sum([_divmod(nums[i] * den * y_s[i] % prime, dens[i], prime)
-               for i in range(k)])
-    return (_divmod(num, den, prime) + prime) % prime
+    if x == 0:
+        basis = _lagrange_basis_at_zero(tuple(x_s), prime)
+        return int(sum(b_i * y_i for b_i, y_i in zip(basis, y_s)) % prime)
+
+    diffs = [(x - x_i) % prime for x_i in x_s]
+    if 0 in diffs:  # x is one of the given points
+        return int(y_s[diffs.index(0)] % prime)
+
+    # Compute the whole numerator product once, then divide out each term
+    num_all = _product(diffs, prime)
+    nums = [num_all * inv_diff % prime
+            for inv_diff in _batch_modinv(diffs, prime)]
+    inv_dens = _lagrange_inverse_denominators(tuple(x_s), prime)
+    result = 0
+    for num, y_i, inv_den in zip(nums, y_s, inv_dens):
+        result = (result + num * y_i % prime * inv_den) % prime
+    return int(result)
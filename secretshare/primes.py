@@ -22,9 +22,10 @@
 
 
 from binascii import a2b_base64, b2a_base64
-from typing import Dict, Optional
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
 
-from passphrase.random import randint
+from passphrase.random import randbytes, randint
 
 from .calc import bytes_to_int, int_to_bytes
 
@@ -34,56 +35,80 @@ class Primes:
 
     # The following primes are the closest bigger than 2^bits-1, assuring the
     # required number of bits of security is met.
-    _PRIMES: Dict[int, bytes] = {
+    _PRIMES: Dict[int, int] = {
         # Lower values are too small
-        128: b'AQAAAAAAAAAAAAAAAAAAADM=',
-        256: b'AQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAEp',
-        512: b'Af//////////////////////////////////////////////////////////////'
-             b'////////////////////////',  # 13th Mersenne prime
+        128: 0x100000000000000000000000000000033,
+        256: 0x10000000000000000000000000000000000000000000000000000000000000129,
+        512: 2 ** 521 - 1,  # 13th Mersenne prime
         # The following primes were generated with ssh-keygen
-        1024: b'w6/AZR8enj1UPxvgqHvqcwubIWZdBMkdry74x+j+qUCQuOHgAJFjDTvuDEJWwk5'
-              b'K6+bYj/Iv9hB/Ol33cG64kscRcng9NsNV0HVMC/lMjuQnohqRXyOluCcMjFcFtY'
-              b'RUEykr8LkrHusbXRtkV+fOh1TGZA5xyR1STftXM0YArQM=',
-        2048: b'6gMD0D/2m8q9wl3epqyc/ujDbvSMfyiCtl1Wiw0Up9rM9Kbo6QVyfAuYL6TXxOW'
-              b'd2vRwTQ7HZ9ebE6MkZ8jTn2FbUmjkM43XDGByxwLN9vORU8Ry5mir8LhbjQhFQC'
-              b'eqUuMifFugF7JVj3phHwnHvl4opHL6tRxx/36MdYzVIFxWLzZ02UHvLex/Oz9Jx'
-              b'M46nde0J1vVN78EpKjpj6pCrQoigM/A1GkjOe7IA7af3DMFeDf70jPba3iSD3BJ'
-              b'tfnKnP3Zg1G555RyZUOfSEKTBtbKsId08rdCemHadXN10mwIuZvK+4CF5B26Dkn'
-              b'RQu7BZMwxU6sxGft2AzszakNIvw==',
-        4096: b'wofaFpLIdg2InKvqanBV+tsTyfBkyHMi1Wm5xXQAHeuhaF2o3/uaESU/aFowReL'
-              b'OugV8Nd1Bf3FxEJSQB3ArJaN67mDDoamqahZnwVu///Fz3yeBOnSVl1aCKrNKK7'
-              b'l7L0CMxqmUrcg/BcuAKHhLhZolAy1pHx3fsah/R+3Cif5EUr5OTXsHdFwdWpAef'
-              b'vBSFGXf/B7sq35PFRcqkCV6/8oRtFWt0kBnsgwg7fm1tZvf2uA78Ks5oT5gUVyo'
-              b'reMnO7yoKQ07WB+Sth8aiTq/8WJVqSJmOBWWQPeGm1wwyP/zwzeLFOGlUpyN4SC'
-              b'p4gmTiOEhe938wXCPN+dL3l0KLc/cTdJ7ppfD+COBgtp8XQJDHghgZzWMyam07/'
-              b'fI1/yfDIwFKIh6GUptBhOu4e7dx6MVrBoXjpN35Ij0k2dXO6jt+A/W7eLSVvBhS'
-              b'vgbj7GyQ+p/BMpr4OC+n0NSXTtnGNql4v09IL4/N+1ALa/X8Zw55RpAho0/edRc'
-              b'1CKp90VNs/7/IFvkwQI0kU/YiCs0Tb+1wr5bV26pTrYsOvzQEu5/gvB0S+Bnc26'
-              b'aeO845vBkdOAld28TivhOQJOrNmg6YNDbXLn3XKfEMDBZ4N3OOmQaMnj1AV/ULq'
-              b'p5ty5fDS79qt47drI91MKjnzWbPKAPdYS3KYALPgHcPUzUs7AWBJ8=',
-        8192: b'4/y9z9QaQJxYvgg7ZIWi1n4gkxsfRpd0uuDxqyiYuAADJYGxxPxx/hNgh5N6iFr'
-              b'7b8nlgt2XuN460q+GFBnV8GJ4MW36eLrn7wmYifDplXXHgS5yQLZ2I+eHdzcBOn'
-              b'1ds2OAQAg0AOjydgC6wGUNJCIMobPAX7fdcEaaIB2/8TCOyhxxUqYBa7ib+2xiV'
-              b'xXukakuoYSPCySRqpIYdGjZ6EQmedf19rZLydWj1Om1jFnu62X41rcKcQmeG0IL'
-              b'wP11DLLzM8I8l5Zr5yemttmuyMDrJDbgF3DwOEC/7JIou23UbOJ9VznhhCn0ZP/'
-              b'2gSsPZqiwAkvgMpSQC40Lw8pnhfjEGO/nBoss0ZClS7n5DgWIWlyF3AaUlcIAn3'
-              b'nb/Xd019ZbmDH9wpXOFG9OuR3FarvQtkvq88NA4L8SOhFdEiidRLZQ/4Rhc0MI9'
-              b'HAc8sGZZ22ztIBPzb1rCMXUh1BzrVxXXKC2RZdHKlwj60J3tSsRKPOxrjY+NqLC'
-              b'1u9fzgDuFXOkCtWs3NrePiZyl5z2jodTBSCyyiwREMvktjHzq+g8/9t9Ws3W3KW'
-              b'RbjCxdx/inE9gFjtiNJtmwO3c6FAvfEndQInqWuMf+yIKiMjSMjZ7Uvq3ZE8C5+'
-              b'wQN4aXITzw2Q2oOplBwhfFWfiN7GWHrZU8lfEcV18O+pzAZQlVxzORDy+Qx4rjZ'
-              b'/Z7D0lqEA4LAYcxQE0rrsdCD4wrH7ZhKvaezzafI23Qv7Csuu1BQbKhRZHGR1/F'
-              b'w9TptiKez34ojAFdWaNd5n9jPcWGYJqzq4WgK5nd8bb6fVTUst23Z8qreXyfspW'
-              b'UuAtbqs93dmbQs1zm79jkYnDE1xW3T+pk/jT79DMrtOhHfKQ4ZFwkREQX6ldptQ'
-              b'eSX7S4/FnkKfHsWTw5f3EIeggLOaGStRR9BNnzDcI3dkyBDlGbdO6Q8EfQgpEEt'
-              b'roaAfHMGMhb559SCE+tbXvz7aNtY5gdi3VnZ0DbGqbgatDB9qO2ZdLZ0ONj/ON7'
-              b'WBxoKl9VTYIISc7nBmp9sBHqfZFrSkUhLLvHpWra0z0gO4oe2gMGSjQ1GRbCQ+Z'
-              b'dRUJZdMFGimJrdztIliEIID8CgU8VZAFJvMIyXEDyRX8GGMqv3iYWIyby+B6Mcn'
-              b'+v7RtD46yHUun07f9bWL0xaIK1VeYyeP6wC2EURwPAYLYYjzUo4XbpstWZZXkEi'
-              b'3I+tnjNVvqXkAQnDp+I8jVATFIu0Hbp8ocJfy92AKLUVm0vbvtgCphUthzbQ2ME'
-              b'DU8w2WuwEe9LsODyEZL3KxBrTzinn6OEl4w8Kpq5RTS+Acg5J7yVqcXlXmGNfF1'
-              b'3qfo5Zk7vEbLVD1k5ba183CPxeUhYW9iDQu7WrGU0Sw==',
+        1024: int(
+            'c3afc0651f1e9e3d543f1be0a87bea730b9b21665d04c91daf2ef8c7e8fea940'
+            '90b8e1e00091630d3bee0c4256c24e4aebe6d88ff22ff6107f3a5df7706eb892'
+            'c71172783d36c355d0754c0bf94c8ee427a21a915f23a5b8270c8c5705b58454'
+            '13292bf0b92b1eeb1b5d1b6457e7ce8754c6640e71c91d524dfb57334600ad03', 16),
+        2048: int(
+            'ea0303d03ff69bcabdc25ddea6ac9cfee8c36ef48c7f2882b65d568b0d14a7da'
+            'ccf4a6e8e905727c0b982fa4d7c4e59ddaf4704d0ec767d79b13a32467c8d39f'
+            '615b5268e4338dd70c6072c702cdf6f39153c472e668abf0b85b8d08454027aa'
+            '52e3227c5ba017b2558f7a611f09c7be5e28a472fab51c71ff7e8c758cd5205c'
+            '562f3674d941ef2dec7f3b3f49c4ce3a9dd7b4275bd537bf04a4a8e98faa42ad'
+            '0a2280cfc0d4692339eec803b69fdc33057837fbd233db6b78920f7049b5f9ca'
+            '9cfdd98351b9e7947265439f48429306d6cab08774f2b7427a61da757375d26c'
+            '08b99bcafb8085e41dba0e49d142eec164cc3153ab3119fb76033b336a4348bf', 16),
+        4096: int(
+            'c287da1692c8760d889cabea6a7055fadb13c9f064c87322d569b9c574001deb'
+            'a1685da8dffb9a11253f685a3045e2ceba057c35dd417f717110949007702b25'
+            'a37aee60c3a1a9aa6a1667c15bbffff173df27813a74959756822ab34a2bb97b'
+            '2f408cc6a994adc83f05cb8028784b859a25032d691f1ddfb1a87f47edc289fe'
+            '4452be4e4d7b07745c1d5a901e7ef0521465dffc1eecab7e4f15172a90257aff'
+            'ca11b455add24067b20c20edf9b5b59bdfdae03bf0ab39a13e60515ca8ade327'
+            '3bbca8290d3b581f92b61f1a893abff16255a9226638159640f7869b5c30c8ff'
+            'f3c3378b14e1a5529c8de120a9e2099388e1217bddfcc1708f37e74bde5d0a2d'
+            'cfdc4dd27ba697c3f8238182da7c5d02431e086067358cc9a9b4eff7c8d7fc9f'
+            '0c8c0528887a194a6d0613aee1eeddc7a315ac1a178e9377e488f49367573ba8'
+            'edf80fd6ede2d256f0614af81b8fb1b243ea7f04ca6be0e0be9f43525d3b6718'
+            'daa5e2fd3d20be3f37ed402dafd7f19c39e51a40868d3f79d45cd422a9f7454d'
+            'b3feff205be4c10234914fd8882b344dbfb5c2be5b576ea94eb62c3afcd012ee'
+            '7f82f0744be067736e9a78ef38e6f06474e025776f138af84e4093ab36683a60'
+            'd0db5cb9f75ca7c4303059e0ddce3a641a3278f5015fd42eaa79b72e5f0d2efd'
+            'aade3b76b23dd4c2a39f359b3ca00f7584b729800b3e01dc3d4cd4b3b016049f', 16),
+        8192: int(
+            'e3fcbdcfd41a409c58be083b6485a2d67e20931b1f469774bae0f1ab2898b800'
+            '032581b1c4fc71fe136087937a885afb6fc9e582dd97b8de3ad2af861419d5f0'
+            '6278316dfa78bae7ef099889f0e99575c7812e7240b67623e7877737013a7d5d'
+            'b3638040083400e8f27600bac0650d24220ca1b3c05fb7dd70469a201dbff130'
+            '8eca1c7152a6016bb89bfb6c625715ee91a92ea1848f0b2491aa92187468d9e8'
+            '442679d7f5f6b64bc9d5a3d4e9b58c59eeeb65f8d6b70a71099e1b420bc0fd75'
+            '0cb2f333c23c97966be727a6b6d9aec8c0eb2436e01770f03840bfec9228bb6d'
+            'd46ce27d5739e18429f464fff6812b0f66a8b0024be03294900b8d0bc3ca6785'
+            'f8c418efe7068b2cd190a54bb9f90e05885a5c85dc069495c2009f79dbfd7774'
+            'd7d65b9831fdc295ce146f4eb91dc56abbd0b64beaf3c340e0bf123a115d1228'
+            '9d44b650ff8461734308f4701cf2c199676db3b4804fcdbd6b08c5d4875073ad'
+            '5c575ca0b64597472a5c23eb4277b52b1128f3b1ae363e36a2c2d6ef5fce00ee'
+            '1573a40ad5acdcdade3e2672979cf68e87530520b2ca2c1110cbe4b631f3abe8'
+            '3cffdb7d5acdd6dca5916e30b1771fe29c4f60163b62349b66c0eddce8502f7c'
+            '49dd4089ea5ae31ffb220a88c8d232367b52fab7644f02e7ec10378697213cf0'
+            'd90da83a9941c217c559f88dec6587ad953c95f11c575f0efa9cc0650955c733'
+            '910f2f90c78ae367f67b0f496a100e0b018731404d2baec7420f8c2b1fb6612a'
+            'f69ecf369f236dd0bfb0acbaed4141b2a14591c6475fc5c3d4e9b6229ecf7e28'
+            '8c015d59a35de67f633dc586609ab3ab85a02b99ddf1b6fa7d54d4b2ddb767ca'
+            'ab797c9fb29594b80b5baacf777666d0b35ce6efd8e46270c4d715b74fea64fe'
+            '34fbf4332bb4e8477ca438645c24444417ea5769b507925fb4b8fc59e429f1ec'
+            '593c397f71087a080b39a192b5147d04d9f30dc237764c810e519b74ee90f047'
+            'd0829104b6ba1a01f1cc18c85be79f52084fad6d7bf3eda36d63981d8b756767'
+            '40db1aa6e06ad0c1f6a3b665d2d9d0e363fce37b581c682a5f554d820849cee7'
+            '066a7db011ea7d916b4a45212cbbc7a56adad33d203b8a1eda03064a34351916'
+            'c243e65d45425974c1468a626b773b48962108203f02814f15640149bcc2325c'
+            '40f2457f0618caafde26162326f2f81e8c727fafed1b43e3ac8752e9f4edff5b'
+            '58bd316882b555e63278feb00b61144703c060b6188f3528e176e9b2d5996579'
+            '048b723eb678cd56fa979004270e9f88f235404c522ed076e9f287097f2f7600'
+            'a2d4566d2f6efb600a9854b61cdb4363040d4f30d96bb011ef4bb0e0f21192f7'
+            '2b106b4f38a79fa384978c3c2a9ab94534be01c83927bc95a9c5e55e618d7c5d'
+            '77a9fa39664eef11b2d50f59396dad7cdc23f17948585bd88342eed6ac65344b', 16),
     }
+    _SORTED_BITS: Tuple[int, ...] = tuple(sorted(_PRIMES))
+    _MIN_BITS: int = _SORTED_BITS[0]
+    _MAX_BITS: int = _SORTED_BITS[-1]
 
     @staticmethod
     def encode(num: int) -> bytes:
@@ -98,35 +123,32 @@ class Primes:
     @classmethod
     def min_bits(cls) -> int:
         """Minimum amount of bits than can be processed with these primes."""
-        return min(cls._PRIMES.keys())
+        return cls._MIN_BITS
 
     @classmethod
     def max_bits(cls) -> int:
         """Maximum amount of bits than can be processed with these primes."""
-        return max(cls._PRIMES.keys())
+        return cls._MAX_BITS
 
     @classmethod
     def min_bytes(cls) -> int:
         """Minimum amount of bytes than can be processed with these primes."""
-        return cls.min_bits() // 8
+        return cls._MIN_BITS // 8
 
     @classmethod
     def max_bytes(cls) -> int:
         """Maximum amount of bytes than can be processed with these primes."""
-        return cls.max_bits() // 8
+        return cls._MAX_BITS // 8
 
     @classmethod
     def biggest(cls) -> int:
         """Get the biggest prime."""
-        return cls.get(bits=cls.max_bits())
+        return cls._PRIMES[cls._MAX_BITS]
 
     @classmethod
     def get(cls, bits: int) -> Optional[int]:
         """Get a prime number for the given number of security bits, if any."""
-        b64 = cls._PRIMES.get(bits)
-        if b64 is None:
-            return None
-        return cls.decode(b64)
+        return cls._PRIMES.get(bits)
 
     @classmethod
     def get_closest(cls, *, bits: Optional[int] = None,
@@ -148,22 +170,19 @@ class Primes:
         :param num: Find a prime immediately larger than `num`.
         """
         if num is not None:
-            get_bits = cls.get_closest_bits(bits=num.bit_length())
-            if not get_bits:
-                return None
-            prime = cls.get(get_bits)
-            if prime and prime > num:
-                return get_bits
-            # Choose the next prime
-            return cls.get_closest_bits(bits=get_bits * 2)
-
-        get_bits = None
-        if bits is not None:
-            for bts in cls._PRIMES:
-                if bts >= bits:
-                    get_bits = bts
-                    break
-        return get_bits
+            index = bisect_left(cls._SORTED_BITS, num.bit_length())
+            if index < len(cls._SORTED_BITS) \
+                    and cls._PRIMES[cls._SORTED_BITS[index]] <= num:
+                # Choose the next prime
+                index += 1
+        elif bits is not None:
+            index = bisect_left(cls._SORTED_BITS, bits)
+        else:
+            return None
+
+        if index < len(cls._SORTED_BITS):
+            return cls._SORTED_BITS[index]
+        return None
 
     @classmethod
     def random_int(cls, bits: int) -> int:
@@ -172,17 +191,34 @@ class Primes:
         Secure means, besides being cryptographically secure, that the integer
         number is lower than the prime closest bigger to the number of bits.
         """
-        min_bits = cls.min_bits()
-        if bits < min_bits:
-            raise ValueError(f'bits must be bigger or equal than {min_bits}')
-        max_bits = cls.max_bits()
-        if bits > max_bits:
-            raise ValueError(f'bits must be lower than {max_bits}')
+        return cls.random_ints(bits, 1)[0]
+
+    @classmethod
+    def random_ints(cls, bits: int, count: int) -> List[int]:
+        """Generate `count` secure random integers for the given number of bits.
+
+        Like `random_int`, but drawing the random bytes for all of them at once.
+        """
+        if bits < cls._MIN_BITS:
+            raise ValueError(f'bits must be bigger or equal than {cls._MIN_BITS}')
+        if bits > cls._MAX_BITS:
+            raise ValueError(f'bits must be lower than {cls._MAX_BITS}')
+        if count < 1:
+            raise ValueError('count must be bigger than 0')
         prime = cls.get_closest(bits=bits)
-        random_number = randint(bits)
-        while random_number > prime:
-            random_number = randint(bits)
-        return random_number
+        nbytes = (bits + 7) >> 3
+        excess_bits = (nbytes << 3) - bits
+        total_bytes = nbytes * count
+        buffer = randbytes(total_bytes)
+        random_numbers = [
+            int.from_bytes(buffer[start:start + nbytes], 'big') >> excess_bits
+            for start in range(0, total_bytes, nbytes)
+        ]
+        # Only primes with exactly `bits` bits can reject samples
+        for index in range(count):
+            while random_numbers[index] >= prime:
+                random_numbers[index] = randint(bits)
+        return random_numbers
 
     @classmethod
     def random_bytes(cls, bits: int) -> bytes:
@@ -24,18 +24,47 @@ Implements Shamir's secret sharing algorithm.
 """
 
 from abc import ABC, abstractmethod
+from base64 import b64encode
 from binascii import a2b_base64, b2a_base64
-from math import ceil
-from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-from .calc import bytes_to_int, int_to_bytes
-from .calc import eval_poly_at_point, lagrange_interpolate
+from .calc import eval_poly_at_range, iter_poly_at_range, lagrange_interpolate
 from .primes import Primes
 
 
 class AbstractRepr(ABC):
     """Abstract class that provides a generic repr method."""
 
+    __slots__ = ()
+
+    # Slots that are not part of the representation, such as caches
+    _REPR_EXCLUDED: Tuple[str, ...] = tuple()
+    _slots_attributes: Tuple[str, ...] = tuple()
+    _slots_public_attributes: Tuple[str, ...] = tuple()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Store the slots of the class and its parents alphabetically ordered.
+
+        Their public counterparts, as exported by `_get_attributes`, are stored
+        as well. Slots listed in `_REPR_EXCLUDED` are left out.
+        """
+        super().__init_subclass__(**kwargs)
+        slots = set()
+        for klass in cls.__mro__:
+            slots.update(getattr(klass, '__slots__', tuple()))
+        slots.difference_update(cls._REPR_EXCLUDED)
+        cls._slots_attributes = tuple(sorted(slots))
+        cls._slots_public_attributes = tuple(
+            cls._public_attribute(attr) for attr in cls._slots_attributes
+        )
+
+    @classmethod
+    def _public_attribute(cls, attr: str) -> str:
+        """Get the public counterpart of an attribute, if any."""
+        if attr[0] == '_' and hasattr(cls, attr[1:]):
+            return attr[1:]
+        return attr
+
     @property
     def _attributes(self) -> Tuple[str, ...]:
         """Get a tuple of all object's attributes alphabetically ordered.
@@ -45,13 +74,10 @@ class AbstractRepr(ABC):
         """
         # __slots__ and __dict__ might coexist, where a parent might define
         # __slots__, and a child not (thus using __dict__)
-        attrs = set()
-        if hasattr(self, '__slots__'):
-            for cls in self.__class__.__mro__:
-                attrs.update(getattr(cls, '__slots__', tuple()))
-        if hasattr(self, '__dict__'):
-            attrs.update(self.__dict__.keys())
-        return tuple(sorted(attrs))
+        instance_dict = getattr(self, '__dict__', None)
+        if not instance_dict:
+            return self._slots_attributes
+        return tuple(sorted(set(self._slots_attributes).union(instance_dict)))
 
     def _get_attributes(self) -> Iterator[str]:
         """Get the object's attributes, using getters if any.
@@ -60,12 +86,9 @@ class AbstractRepr(ABC):
         exported solely as the public counterpart, whereas private without
         public counterparts are exported as is.
         """
-        return (
-            attr[1:]
-            if attr[0] == '_' and hasattr(self.__class__, attr[1:])
-            else attr
-            for attr in self._attributes
-        )
+        if not getattr(self, '__dict__', None):
+            return iter(self._slots_public_attributes)
+        return (self._public_attribute(attr) for attr in self._attributes)
 
     def __repr__(self) -> str:
         """Get the unique representation of the object as string."""
@@ -77,7 +100,10 @@ class AbstractRepr(ABC):
 class AbstractValue(AbstractRepr):
     """Abstract helper class to handle secret and share values."""
 
-    __slots__ = '_value',
+    __slots__ = '_b64_cache', '_value',
+
+    _REPR_EXCLUDED = '_b64_cache',
+    _MAX_VALUE = Primes.biggest() - 1
 
     @abstractmethod
     def __bytes__(self) -> bytes:
@@ -85,8 +111,15 @@ class AbstractValue(AbstractRepr):
 
     def __str__(self) -> str:
         """Get the string representation of the object."""
-        # b2a_base64 adds a newline char at the end
-        return self.to_base64().decode('utf8')[:-1]
+        # Encode once: the cache is cleared whenever the value changes
+        b64 = self._b64_cache
+        if b64 is None:
+            b64 = self._b64_cache = b64encode(bytes(self)).decode('utf8')
+        return b64
+
+    def _reset_cache(self) -> None:
+        """Reset values cached from the object's data, after it changes."""
+        self._b64_cache = None
 
     def __int__(self) -> int:
         """Get the value of the object as integer."""
@@ -99,7 +132,7 @@ class AbstractValue(AbstractRepr):
     @staticmethod
     def max_value() -> int:
         """Get the biggest possible value."""
-        return Primes.biggest() - 1
+        return AbstractValue._MAX_VALUE
 
     @property
     def value(self) -> int:
@@ -113,12 +146,13 @@ class AbstractValue(AbstractRepr):
             raise TypeError('value must be integer')
         if value <= 0:
             raise ValueError('value must be bigger than 0')
-        max_value = self.max_value()
+        max_value = self._MAX_VALUE
         if value > max_value:
             raise ValueError(
                 f'value has to be smaller or equal than {max_value}'
             )
         self._value = value
+        self._reset_cache()
 
     @abstractmethod
     def from_bytes(self, bytes_value: bytes) -> None:
@@ -126,13 +160,13 @@ class AbstractValue(AbstractRepr):
 
     def from_hex(self, hex_value: str) -> None:
         """Set object values from hex string (support beggining with 0x)."""
-        try:
-            bts = bytes.fromhex(hex_value)
-        except ValueError:
-            hex_val = hex_value[2:] if hex_value[:2] == '0x' else hex_value
-            hex_ = '0' + hex_val if len(hex_val) % 2 else hex_val
-            bts = bytes.fromhex(hex_)
-        self.from_bytes(bts)
+        if not isinstance(hex_value, str):
+            raise TypeError('hex_value must be str')
+        # Whitespace between bytes is allowed, but must not count for the parity
+        hex_val = ''.join(hex_value.split())
+        hex_val = hex_val[2:] if hex_val[:2] == '0x' else hex_val
+        hex_ = '0' + hex_val if len(hex_val) & 1 else hex_val
+        self.from_bytes(bytes.fromhex(hex_))
 
     def from_base64(self, b64_value: Union[bytes, str]) -> None:
         """Set object values from a base64 encoded string."""
@@ -155,6 +189,10 @@ class AbstractValue(AbstractRepr):
 class Secret(AbstractValue):
     """Helper class to handle a secret value."""
 
+    __slots__ = '_field_bits',
+
+    _REPR_EXCLUDED = AbstractValue._REPR_EXCLUDED + ('_field_bits',)
+
     def __init__(self, value: Optional[int] = None):
         """Handle a secret, providing several helper functions.
 
@@ -165,9 +203,31 @@ class Secret(AbstractValue):
         if not value:
             self.random()
 
+    @classmethod
+    def _unchecked(cls, value: int) -> 'Secret':
+        """Create a secret from a trusted value, skipping validation."""
+        secret = cls.__new__(cls)
+        secret._value = value
+        secret._reset_cache()
+        return secret
+
+    def _reset_cache(self) -> None:
+        """Reset values cached from the secret value, after it changes."""
+        super()._reset_cache()
+        self._field_bits = None
+
+    @property
+    def field_bits(self) -> int:
+        """Get the number of security bits of the prime field for the secret."""
+        bits = self._field_bits
+        if bits is None:
+            bits = self._field_bits = Primes.get_closest_bits(num=self._value)
+        return bits
+
     def __bytes__(self) -> bytes:
         """Get the value of the secret as bytes."""
-        return int_to_bytes(self.value)
+        value = self._value
+        return value.to_bytes((value.bit_length() + 7) >> 3, 'big')
 
     @staticmethod
     def max_bits() -> int:
@@ -185,7 +245,7 @@ class Secret(AbstractValue):
             raise TypeError('bytes_value must be bytes')
         if bytes_value[0] == 0:
             raise ValueError('bytes_value can not begin with a null byte')
-        self.value = bytes_to_int(bytes_value)
+        self.value = int.from_bytes(bytes_value, 'big')
 
     def random(self, bits: Optional[int] = None) -> None:
         """Generate a random value for the secret.
@@ -208,11 +268,12 @@ class Share(AbstractValue):
     function.
     """
 
-    __slots__ = '_point',
+    __slots__ = '_bytes_cache', '_point',
 
-    @property
-    def _max_point_bytes_len(self) -> int:
-        return ceil(self.max_point().bit_length() / 8)
+    _REPR_EXCLUDED = AbstractValue._REPR_EXCLUDED + ('_bytes_cache',)
+    _MAX_POINT = Primes.max_bits() - 1
+    # Bytes used to serialize the point, fixed by the biggest possible point
+    _MAX_POINT_BYTES_LEN = (_MAX_POINT.bit_length() + 7) >> 3
 
     def __init__(self, point: int = 1, value: Optional[int] = None):
         """Create a share consisting on a point and a value.
@@ -225,16 +286,36 @@ class Share(AbstractValue):
         super().__init__(value)
         self.point = point
 
+    @classmethod
+    def _unchecked(cls, point: int, value: int) -> 'Share':
+        """Create a share from trusted point and value, skipping validation."""
+        share = cls.__new__(cls)
+        share._point = point
+        share._value = value
+        share._reset_cache()
+        return share
+
+    def _reset_cache(self) -> None:
+        """Reset values cached from the share point and value, after they change."""
+        super()._reset_cache()
+        self._bytes_cache = None
+
     def __index__(self) -> int:
         """Get the value of `point` for use of the object as index."""
         return self.point
 
     def __bytes__(self) -> bytes:
         """Get the representation in bytes of the share."""
-        point_bytes = self.point.to_bytes(self._max_point_bytes_len, 'big')
-        # reverse point_bytes because most of the times it has a \x00 as MSB,
-        # which gets lost on encodings/transformations such as int
-        return point_bytes[::-1] + int_to_bytes(self.value)
+        bts = self._bytes_cache
+        if bts is None:
+            # point is stored little-endian because most of the times it has a
+            # \x00 as MSB, which gets lost on encodings/transformations such as int
+            point_bytes = self._point.to_bytes(self._MAX_POINT_BYTES_LEN, 'little')
+            value = self._value
+            # A split value can be 0, whose bit_length is 0
+            value_bytes = value.to_bytes((value.bit_length() + 7) >> 3 or 1, 'big')
+            bts = self._bytes_cache = point_bytes + value_bytes
+        return bts
 
     def from_bytes(self, bytes_value: bytes) -> None:
         """Set share point and value from bytes.
@@ -244,14 +325,14 @@ class Share(AbstractValue):
         if not isinstance(bytes_value, bytes):
             raise TypeError('bytes_value must be bytes')
 
-        point_bytes_len = self._max_point_bytes_len
-        self.point = bytes_to_int(bytes_value[:point_bytes_len][::-1])
-        self.value = bytes_to_int(bytes_value[point_bytes_len:])
+        point_bytes_len = self._MAX_POINT_BYTES_LEN
+        self.point = int.from_bytes(bytes_value[:point_bytes_len], 'little')
+        self.value = int.from_bytes(bytes_value[point_bytes_len:], 'big')
 
     @staticmethod
     def max_point() -> int:
         """Get the biggest possible point."""
-        return Primes.max_bits() - 1
+        return Share._MAX_POINT
 
     @property
     def point(self) -> int:
@@ -265,12 +346,13 @@ class Share(AbstractValue):
             raise TypeError('point must be integer')
         if point < 1:
             raise ValueError('point must be bigger than or equal to 1')
-        max_point = self.max_point()
+        max_point = self._MAX_POINT
         if point > max_point:
             raise ValueError(
                 f'point must be smaller than or equal to {max_point}'
             )
         self._point = point
+        self._reset_cache()
 
 
 class SecretShare(AbstractRepr):
@@ -280,11 +362,11 @@ class SecretShare(AbstractRepr):
     https://en.wikipedia.org/wiki/Shamir%27s_Secret_Sharing#Python_example
     """
 
-    __slots__ = '_secret', '_share_count', '_shares', '_threshold',
+    __slots__ = '_precomputed', '_secret', '_share_count', '_shares', '_threshold',
 
     def __init__(self, threshold: int = 2, share_count: int = 3, *,
                  secret: Optional[Secret] = None,
-                 shares: Optional[Sequence[Share]] = None):
+                 shares: Optional[Iterable[Share]] = None):
         """Share a secret using Shamir's secret share algorithm.
 
         :param threshold: Minimal amount of parts required to recover the
@@ -293,39 +375,24 @@ class SecretShare(AbstractRepr):
                             2 (defaults to 3).
         :param secret: A `Secret` object containing the secret to be shared. If
                        not set, a random one is generated.
+        :param shares: An iterable of `Share` objects to combine (optional).
         """
         self.threshold = threshold
         self.share_count = share_count
         self.secret = secret if secret else Secret()
         self.shares = shares if shares else []
 
-    def _prime(self, *, combine: bool = False) -> int:
-        """Get the prime number in use for the field.
+    def _generate_random_poly(self, secret_value: int,
+                              bits: int) -> List[int]:
+        """Generate a random polynomial for Shamir's secret splitting.
 
-        :param combine: True to get the number for a combination of shares,
-                        False to get the number for a secret splitting.
-        """
-        if combine:
-            num = max(share.value for share in self.shares)
-        else:
-            num = int(self.secret)
-        return Primes.get_closest(num=num)
+        Every call returns a new polynomial, so it is intentionally not a
+        property: callers must keep the result for as long as they need it.
 
-    @property
-    def _prime_for_split(self) -> int:
-        """Get the prime used to split a secret."""
-        return self._prime()
-
-    @property
-    def _prime_for_combine(self) -> int:
-        """Get the prime used to combine shares."""
-        return self._prime(combine=True)
-
-    def _generate_random_poly(self) -> List[int]:
-        """Generate a random polynomial for Shamir's secret splitting."""
-        bits = Primes.get_closest_bits(num=int(self.secret))
-        return [int(self.secret)] + \
-               [Primes.random_int(bits) for _ in range(self.threshold - 1)]
+        :param secret_value: The secret value, used as independent term.
+        :param bits: Number of security bits of the prime used for the field.
+        """
+        return [secret_value] + Primes.random_ints(bits, self.threshold - 1)
 
     @property
     def threshold(self) -> int:
@@ -371,6 +438,7 @@ class SecretShare(AbstractRepr):
         # The Secret class ensures it's not empty
         self._secret: Secret = secret
         self._shares = []
+        self._precomputed: Optional[Tuple[Tuple[int, int, int], List[int]]] = None
 
     @property
     def shares(self) -> List[Share]:
@@ -378,14 +446,19 @@ class SecretShare(AbstractRepr):
         return self._shares
 
     @shares.setter
-    def shares(self, shares: Sequence[Share]) -> None:
+    def shares(self, shares: Iterable[Share]) -> None:
         """Set the shares of a split secret."""
-        if not isinstance(shares, Sequence):
-            raise TypeError('shares must be sequence of Share objects')
-        for share in shares:
+        # Only a non iterable is translated: errors raised while iterating, such
+        # as from a generator, are the caller's and must propagate untouched
+        try:
+            shares_iter = iter(shares)
+        except TypeError:
+            raise TypeError('shares must be an iterable of Share objects') from None
+        shares_list = list(shares_iter)
+        for share in shares_list:
             if not isinstance(share, Share):
-                raise TypeError('shares must be sequence of Share objects')
-        self._shares: List[Share] = list(shares)
+                raise TypeError('shares must be an iterable of Share objects')
+        self._shares: List[Share] = shares_list
 
     @property
     def max_share_count(self) -> int:
@@ -398,41 +471,116 @@ class SecretShare(AbstractRepr):
         # secret length
         return self.secret.value.bit_length() - 1
 
+    @property
+    def precomputed(self) -> bool:
+        """Get whether the random part of the next split is precomputed.
+
+        Precomputed values are only reported if they are still usable, that is,
+        if they were computed for the current field, threshold and share count.
+        """
+        precomputed = self._precomputed
+        return precomputed is not None and precomputed[0] == (
+            self.secret.field_bits, self._threshold, self._share_count)
+
+    def precompute(self) -> None:
+        """Precompute the random part of the next split.
+
+        The random coefficients of the polynomial don't depend on the secret,
+        so they can be generated and evaluated at every point beforehand,
+        leaving `split()` to only add the secret to each value.
+        The precomputed values are used once, and are discarded if the
+        threshold, share count or secret change before splitting.
+        """
+        bits = self.secret.field_bits
+        prime = Primes.get(bits)
+        poly = self._generate_random_poly(0, bits)
+        partials = eval_poly_at_range(poly, self._share_count, prime)
+        self._precomputed = (bits, self._threshold, self._share_count), partials
+
     def split(self) -> List[Share]:
         """Split a secret securely using Shamir's algorithm.
 
         Every call to this method will compute different shares.
         """
+        self.shares = list(self.split_iter())
+        return self.shares
+
+    def split_iter(self) -> Iterator[Share]:
+        """Split a secret securely using Shamir's algorithm, lazily.
+
+        Shares are yielded as they are computed, and are not stored in the
+        object, so only a few of them are kept in memory at once.
+        Every call to this method will compute different shares.
+        """
+        secret = self.secret
+        secret_value = secret.value
+        share_count = self._share_count
         # Validations
         max_share_count = self.max_share_count
-        prime = self._prime_for_split
-        if self.share_count > max_share_count:
+        # Both the prime and the polynomial depend on the field of the secret
+        bits = secret.field_bits
+        prime = Primes.get(bits)
+        if share_count > max_share_count:
             raise ValueError(f'share_count must be lower than {max_share_count} '
                              f'for the given secret')
-        if self.threshold > self.share_count:
+        if self._threshold > share_count:
             raise ValueError('share_count must be bigger than or equal to '
                              'threshold')
 
-        self.shares = []
-        poly = self._generate_random_poly()
-        for point in range(1, self.share_count + 1):
-            share = Share(point, value=eval_poly_at_point(poly, point, prime))
-            self.shares.append(share)
-        return self.shares
+        # Precomputed values must never be used twice
+        precomputed, self._precomputed = self._precomputed, None
+        if precomputed and precomputed[0] == (bits, self._threshold, share_count):
+            values = ((partial + secret_value) % prime
+                      for partial in precomputed[1])
+        else:
+            poly = self._generate_random_poly(secret_value, bits)
+            values = iter_poly_at_range(poly, share_count, prime)
+        # Points and values are in range by construction
+        new_share = Share._unchecked
+        return (new_share(point, value)
+                for point, value in enumerate(values, start=1))
 
     def combine(self) -> Secret:
         """Combine shares of a split secret to recover it."""
-        if len(self.shares) > self.share_count:
+        shares = self._shares
+        shares_len = len(shares)
+        if shares_len > self._share_count:
             raise ValueError(
                 'the number of shares can not be more than the share count'
             )
-        if len(self.shares) < self.threshold:
+        if shares_len < self._threshold:
             raise ValueError(
                 'the number of shares must be bigger or equal than the threshold'
             )
 
-        prime = self._prime_for_combine
-        x_s = [share.point for share in self.shares]
-        y_s = [share.value for share in self.shares]
-        self.secret = Secret(lagrange_interpolate(0, x_s, y_s, prime))
+        # Work on parallel lists of points and values: the prime is chosen from
+        # the values, and the Lagrange basis from the points. The slots are read
+        # directly, skipping the properties: the shares were validated when set
+        x_s = [share._point for share in shares]
+        y_s = [share._value for share in shares]
+        prime = Primes.get_closest(num=max(y_s))
+        # Interpolating at 0 reuses the cached Lagrange basis for these points
+        value = lagrange_interpolate(0, x_s, y_s, prime)
+        # Inconsistent shares can interpolate to 0, which is not a valid secret
+        if not value:
+            raise ValueError('shares do not combine into a valid secret')
+        # The value is reduced modulo a prime of the table, so it is below the
+        # maximum value
+        self.secret = Secret._unchecked(value)
         return self.secret
+
+    def combine_batch(self, shares_sets: Iterable[Iterable[Share]]) -> List[Secret]:
+        """Combine several sets of shares, each of a split secret, to recover them.
+
+        Sets of shares taken from the same points share the Lagrange basis,
+        which is computed once and reused for every other set.
+        Note: as with `combine()`, the last recovered secret is set and the
+        shares are reset.
+
+        :param shares_sets: Sets of shares, one per secret to recover.
+        """
+        secrets = []
+        for shares in shares_sets:
+            self.shares = shares
+            secrets.append(self.combine())
+        return secrets
@@ -1,81 +1,106 @@
 # Wrong types for the types not indicated
+# Every value is built once and shared among the tuples below: they are never
+# modified, only passed to the code under test
+
+_SET = {1, 2}
+_DICT = {'a': 1, 'b': 2}
+_STR = 'aaaa'
+_TUPLE = (1, 2)
+_LIST = [1, 2]
+_FLOAT = 1.2
+_COMPLEX = 1j
+_BYTES = b'a'
+_INT = 1
 
 WRONGTYPES = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    'aaaa',
-    (1, 2),
-    [1, 2],
-    1.2,
-    1j,
-    b'a',
-    1,
+    _SET,
+    _DICT,
+    _STR,
+    _TUPLE,
+    _LIST,
+    _FLOAT,
+    _COMPLEX,
+    _BYTES,
+    _INT,
 )
 
 WRONGTYPES_INT = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    'aaaa',
-    (1, 2),
-    [1, 2],
-    1.2,
-    1j,
-    b'a',
+    _SET,
+    _DICT,
+    _STR,
+    _TUPLE,
+    _LIST,
+    _FLOAT,
+    _COMPLEX,
+    _BYTES,
 )
 
 WRONGTYPES_LIST_TUPLE = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    'aaaa',
+    _SET,
+    _DICT,
+    _STR,
     1234,
     1.234,
-    1j,
-    b'a',
+    _COMPLEX,
+    _BYTES,
 )
 
 WRONGTYPES_SEQUENCE = (
     1234,
     1.234,
-    1j,
+    _COMPLEX,
 )
 
 WRONGTYPES_BYTES = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    (1, 2),
-    [1, 2],
-    1,
+    _SET,
+    _DICT,
+    _TUPLE,
+    _LIST,
+    _INT,
     1.234,
-    1j,
+    _COMPLEX,
     'asd',
 )
 
 WRONGTYPES_STR = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    (1, 2),
-    [1, 2],
-    1,
+    _SET,
+    _DICT,
+    _TUPLE,
+    _LIST,
+    _INT,
     1.234,
-    1j,
-    b'a',
+    _COMPLEX,
+    _BYTES,
 )
 
 WRONGTYPES_STR_BYTES = (
-    {1, 2},
-    {'a': 1, 'b': 2},
-    (1, 2),
-    [1, 2],
-    1,
+    _SET,
+    _DICT,
+    _TUPLE,
+    _LIST,
+    _INT,
     1.234,
-    1j,
+    _COMPLEX,
 )
 
 WRONGTYPES_ITER = (
     {'a', 'b'},
-    {'a': 1, 'b': 2},
-    'aaaa',
+    _DICT,
+    _STR,
     1234,
     1.234,
-    1j,
+    _COMPLEX,
 )
+
+
+def assert_type_errors(test_case, func, wrongtypes, *args, slot=0):
+    """Assert that `func` raises TypeError for every wrong type given.
+
+    Each wrong type is inserted among `args` at position `slot`, and checked in
+    its own subTest so that a failure reports which one was accepted.
+    """
+    for wrongtype in wrongtypes:
+        call_args = args[:slot] + (wrongtype,) + args[slot:]
+        with test_case.subTest(func=func.__name__, wrongtype=wrongtype), \
+                test_case.assertRaises(TypeError):
+            func(*call_args)
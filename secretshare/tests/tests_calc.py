@@ -18,15 +18,22 @@
 #
 #  ***************************************************************************
 
-from unittest import TestCase
+import sys
+from importlib.util import module_from_spec, spec_from_file_location
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
 
 from passphrase.secrets import randbelow
 
-from secretshare.calc import _divmod, _extended_gcd, _product, bytes_to_int, \
-    compute_closest_bigger_equal_pow2, eval_poly_at_point, int_to_bytes, \
-    lagrange_interpolate
+from secretshare import calc
+from secretshare.calc import _batch_modinv, _extended_gcd, \
+    _lagrange_basis_at_zero, _lagrange_inverse_denominators, _modinv, \
+    _product, bytes_to_int, compute_closest_bigger_equal_pow2, \
+    eval_poly_at_point, eval_poly_at_points, eval_poly_at_range, int_to_bytes, \
+    iter_poly_at_range, lagrange_interpolate
 from secretshare.tests.constants import WRONGTYPES_BYTES, WRONGTYPES_INT, \
-    WRONGTYPES_ITER, WRONGTYPES_LIST_TUPLE, WRONGTYPES_SEQUENCE
+    WRONGTYPES_ITER, WRONGTYPES_LIST_TUPLE, WRONGTYPES_SEQUENCE, \
+    assert_type_errors
 
 
 class TestValidInputs(TestCase):
@@ -37,6 +44,7 @@ class TestValidInputs(TestCase):
         for num in nums:
             result *= num
         self.assertEqual(result, _product(nums))
+        self.assertEqual(result % 7, _product(nums, 7))
 
     def test_extended_gcd(self):
         result = _extended_gcd(240, 46)
@@ -44,11 +52,15 @@ class TestValidInputs(TestCase):
         result = _extended_gcd(-257, 7)
         self.assertEqual(result, (-3, -110))
 
-    def test_divmod(self):
-        result = _divmod(1, 100, 7)
-        self.assertEqual(result, -3)
-        result = _divmod(3, 256, 5)
-        self.assertEqual(result, 3)
+    def test_modinv(self):
+        self.assertEqual(_modinv(100, 7), 4)
+        self.assertEqual(_modinv(-3, 7), 2)
+
+    def test_batch_modinv(self):
+        values = [1, 2, 3, 4, 5, 6, 100, -3]
+        result = _batch_modinv(values, 7)
+        self.assertEqual(result, [_modinv(value, 7) for value in values])
+        self.assertEqual(_batch_modinv([], 7), [])
 
     def test_int_to_bytes(self):
         result = int_to_bytes(1)
@@ -57,6 +69,9 @@ class TestValidInputs(TestCase):
         self.assertEqual(result, b'\xff')
         result = int_to_bytes(0)
         self.assertEqual(result, b'\x00')
+        # Same as the builtin with the minimal length
+        for num, length in ((255, 1), (256, 2), (2 ** 521 - 1, 66)):
+            self.assertEqual(int_to_bytes(num), num.to_bytes(length, 'big'))
 
     def test_bytes_to_int(self):
         result = bytes_to_int(b'\x01')
@@ -65,6 +80,10 @@ class TestValidInputs(TestCase):
         self.assertEqual(result, -1)
         result = bytes_to_int(b'\x00')
         self.assertEqual(result, 0)
+        for bts in (b'\x00\x01', b'\xff' * 66):
+            self.assertEqual(bytes_to_int(bts), int.from_bytes(bts, 'big'))
+            self.assertEqual(bytes_to_int(bts, True),
+                             int.from_bytes(bts, 'big', signed=True))
 
     def test_compute_closest_bigger_equal_pow2(self):
         result = compute_closest_bigger_equal_pow2(0)
@@ -85,65 +104,184 @@ class TestValidInputs(TestCase):
         self.assertEqual(result, 2)
         result = eval_poly_at_point(poly, -1, prime)
         self.assertEqual(result, 5)
+        result = eval_poly_at_point(tuple(poly), 1, prime)
+        self.assertEqual(result, 0)
+
+    def test_eval_poly_at_points(self):
+        poly = [2, 3, 4, 5]
+        prime = 7
+        result = eval_poly_at_points(poly, [1, 0, -1], prime)
+        self.assertEqual(result, [0, 2, 5])
+        points = range(1, 10)
+        result = eval_poly_at_points(poly, points, prime)
+        self.assertEqual(
+            result,
+            [eval_poly_at_point(poly, point, prime) for point in points]
+        )
+        self.assertEqual(eval_poly_at_points(poly, [], prime), [])
+        result = eval_poly_at_points(tuple(poly), (1, 0, -1), prime)
+        self.assertEqual(result, [0, 2, 5])
+
+    def test_lagrange_basis_at_zero(self):
+        result = _lagrange_basis_at_zero((2, 4, 6), 7)
+        self.assertEqual(result, (3, 4, 1))
+
+    def test_lagrange_inverse_denominators(self):
+        result = _lagrange_inverse_denominators((2, 4, 6), 7)
+        self.assertEqual(result, (1, 5, 1))
+
+    def test_eval_poly_at_range(self):
+        prime = 101
+        for poly in ([], [2], [2, 3], [2, 3, 4, 5], [99, 100, 0, 7, 55]):
+            for count in (0, 1, 3, 4, 7, 8, 10, 19, 20, 150):
+                result = eval_poly_at_range(poly, count, prime)
+                self.assertEqual(
+                    result,
+                    eval_poly_at_points(poly, range(1, count + 1), prime),
+                    f'poly: {poly}, count: {count}'
+                )
+
+    def test_iter_poly_at_range(self):
+        prime = 101
+        poly = [99, 100, 0, 7, 55]
+        result = iter_poly_at_range(poly, 150, prime)
+        self.assertNotIsInstance(result, list)
+        self.assertEqual(list(result), eval_poly_at_range(poly, 150, prime))
 
     def test_lagrange_interpolate(self):
         result = lagrange_interpolate(1, [0, 2, 4], [1, 5, 17], 11)
         self.assertEqual(result, 2)
         result = lagrange_interpolate(0, [2, 4, 6], [3, 4, 6], 7)
         self.assertEqual(result, 3)
+        result = lagrange_interpolate(2, [0, 2, 4], [1, 5, 17], 11)
+        self.assertEqual(result, 5)
+        result = lagrange_interpolate(0, [0, 2, 4], [1, 5, 17], 11)
+        self.assertEqual(result, 1)
 
 
-class TestInvalidInputs(TestCase):
+def _load_calc(**modules):
+    """Load a private copy of the calc module, importing it with `modules`.
 
-    def test_product(self):
-        for wrongtype in WRONGTYPES_ITER:
-            self.assertRaises(TypeError, _product, wrongtype)
+    Modules mapped to None can't be imported, such as gmpy2 when testing the
+    plain integers code path.
+    """
+    spec = spec_from_file_location('_secretshare_calc', calc.__file__)
+    module = module_from_spec(spec)
+    with patch.dict(sys.modules, modules):
+        spec.loader.exec_module(module)
+    return module
 
-    def test_extended_gcd(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, _extended_gcd, wrongtype, 1)
-            self.assertRaises(TypeError, _extended_gcd, 1, wrongtype)
 
-    def test_divmod(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, _divmod, wrongtype, 1, 2)
-            self.assertRaises(TypeError, _divmod, 1, wrongtype, 2)
-            self.assertRaises(TypeError, _divmod, 1, 1, wrongtype)
-        self.assertRaises(ValueError, _divmod, 1, 1, -1)
+def _calc_results(module):
+    """Get the results of the calc functions with big numbers from a module."""
+    # 2^127-1 is a Mersenne prime
+    prime = 2 ** 127 - 1
+    poly = [prime - 1, 2 ** 100 + 7, 3, prime - 12345]
+    x_s, y_s = [1, 3, 4, 7], [prime - 2, 2 ** 90, 5, prime - 1]
+    return (
+        module.eval_poly_at_point(poly, 5, prime),
+        module.eval_poly_at_points(poly, [1, 2, 100], prime),
+        module.eval_poly_at_range(poly, 20, prime),
+        module.lagrange_interpolate(0, x_s, y_s, prime),
+        module.lagrange_interpolate(2, x_s, y_s, prime),
+        module.lagrange_interpolate(3, x_s, y_s, prime),
+        module._modinv(2 ** 100 + 7, prime),
+        module._batch_modinv([2, 3, 2 ** 100 + 7], prime),
+    )
+
+
+class TestBackends(TestCase):
+    """Both the gmpy2 and the plain integers code paths give the same results."""
+
+    def test_without_gmpy2(self):
+        calc_int = _load_calc(gmpy2=None)
+        self.assertIsNone(calc_int.gmpy2)
+        results = _calc_results(calc_int)
+        for result in results:
+            self.assertNotIn('mpz', repr(result))
+        self.assertEqual(results, _calc_results(calc))
+
+    @skipUnless(calc.gmpy2, 'gmpy2 is not installed')
+    def test_with_gmpy2(self):
+        calc_gmpy2 = _load_calc()
+        self.assertIsNotNone(calc_gmpy2.gmpy2)
+        self.assertEqual(_calc_results(calc_gmpy2),
+                         _calc_results(_load_calc(gmpy2=None)))
+
+    def test_without_pow_inverse(self):
+        # Python < 3.8 can't compute inverses with pow(x, -1, p)
+        calc_int = _load_calc(gmpy2=None)
+        with patch.object(calc_int, '_HAS_POW_INVERSE', False), \
+                patch.object(calc_int, '_extended_gcd',
+                             wraps=calc_int._extended_gcd) as extended_gcd:
+            self.assertEqual(calc_int._modinv(100, 7), 4)
+            self.assertEqual(calc_int._modinv(-3, 7), 2)
+            result = calc_int.lagrange_interpolate(1, [0, 2, 4], [1, 5, 17], 11)
+            self.assertEqual(result, 2)
+            self.assertEqual(_calc_results(calc_int), _calc_results(calc))
+        self.assertTrue(extended_gcd.called)
+
+    def test_pow_inverse_detection(self):
+        self.assertTrue(_load_calc()._HAS_POW_INVERSE)
+        # Loading the module only calls pow to probe for inverses support
+        error = ValueError('pow() 2nd argument cannot be negative when 3rd '
+                           'argument specified')
+        with patch('builtins.pow', side_effect=error) as pow_:
+            calc_old = _load_calc()
+        pow_.assert_called_once_with(2, -1, 3)
+        self.assertFalse(calc_old._HAS_POW_INVERSE)
+
+
+class TestInvalidInputs(TestCase):
+
+    def test_product(self):
+        assert_type_errors(self, _product, WRONGTYPES_ITER)
 
     def test_int_to_bytes(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, int_to_bytes, wrongtype)
+        assert_type_errors(self, int_to_bytes, WRONGTYPES_INT)
 
     def test_bytes_to_int(self):
-        for wrongtype in WRONGTYPES_BYTES:
-            self.assertRaises(TypeError, bytes_to_int, wrongtype)
+        assert_type_errors(self, bytes_to_int, WRONGTYPES_BYTES)
 
     def test_compute_closest_bigger_equal_pow2(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, compute_closest_bigger_equal_pow2,
-                              wrongtype)
+        assert_type_errors(self, compute_closest_bigger_equal_pow2, WRONGTYPES_INT)
         self.assertRaises(ValueError, compute_closest_bigger_equal_pow2, -1)
 
     def test_eval_poly_at_point(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, eval_poly_at_point, [], wrongtype, 2)
-            self.assertRaises(TypeError, eval_poly_at_point, [], 1, wrongtype)
-        for wrongtype in WRONGTYPES_SEQUENCE:
-            self.assertRaises(TypeError, eval_poly_at_point, wrongtype, 1, 2)
+        assert_type_errors(self, eval_poly_at_point, WRONGTYPES_INT, [], 2, slot=1)
+        assert_type_errors(self, eval_poly_at_point, WRONGTYPES_INT, [], 1, slot=2)
+        assert_type_errors(self, eval_poly_at_point, WRONGTYPES_SEQUENCE, 1, 2)
         self.assertRaises(ValueError, eval_poly_at_point, [], 1, -1)
 
+    def test_eval_poly_at_points(self):
+        assert_type_errors(self, eval_poly_at_points, WRONGTYPES_INT, [], [],
+                           slot=2)
+        assert_type_errors(self, eval_poly_at_points, WRONGTYPES_SEQUENCE, [], 2)
+        assert_type_errors(self, eval_poly_at_points, WRONGTYPES_SEQUENCE, [], 2,
+                           slot=1)
+        self.assertRaises(ValueError, eval_poly_at_points, [], [], -1)
+
+    def test_eval_poly_at_range(self):
+        assert_type_errors(self, eval_poly_at_range, WRONGTYPES_INT, [], 2, slot=1)
+        assert_type_errors(self, eval_poly_at_range, WRONGTYPES_INT, [], 1, slot=2)
+        assert_type_errors(self, eval_poly_at_range, WRONGTYPES_SEQUENCE, 1, 2)
+        self.assertRaises(ValueError, eval_poly_at_range, [], -1, 2)
+        self.assertRaises(ValueError, eval_poly_at_range, [], 1, -1)
+
+    def test_iter_poly_at_range(self):
+        # Invalid input must be reported on call, not on iteration
+        assert_type_errors(self, iter_poly_at_range, WRONGTYPES_INT, [1], 2,
+                           slot=1)
+        self.assertRaises(ValueError, iter_poly_at_range, [1], -1, 2)
+
     def test_lagrange_interpolate(self):
-        for wrongtype in WRONGTYPES_INT:
-            self.assertRaises(TypeError, lagrange_interpolate, wrongtype, [],
-                              [], 2)
-            self.assertRaises(TypeError, lagrange_interpolate, 1, [],
-                              [], wrongtype)
-        for wrongtype in WRONGTYPES_LIST_TUPLE:
-            self.assertRaises(TypeError, lagrange_interpolate, 1, wrongtype,
-                              [], 2)
-            self.assertRaises(TypeError, lagrange_interpolate, 1, [],
-                              wrongtype, 2)
+        assert_type_errors(self, lagrange_interpolate, WRONGTYPES_INT, [], [], 2)
+        assert_type_errors(self, lagrange_interpolate, WRONGTYPES_INT, 1, [], [],
+                           slot=3)
+        assert_type_errors(self, lagrange_interpolate, WRONGTYPES_LIST_TUPLE, 1,
+                           [], 2, slot=1)
+        assert_type_errors(self, lagrange_interpolate, WRONGTYPES_LIST_TUPLE, 1,
+                           [], 2, slot=2)
         self.assertRaises(ValueError, lagrange_interpolate, 1, [],
                           [], -1)
         self.assertRaises(AssertionError, lagrange_interpolate, 1, [1, 1],
@@ -72,15 +72,24 @@ class TestValidInputs(TestCase):
         self.assertIsNone(Primes.get_closest_bits(bits=Primes.max_bits() + 1))
         self.assertEqual(Primes.get_closest_bits(num=1234), 128)
         self.assertIsNone(Primes.get_closest_bits(num=Primes.biggest() * 2))
+        self.assertIsNone(Primes.get_closest_bits())
 
     def test_primes_random_int(self):
-        for bits in Primes._PRIMES.keys():
+        for bits, prime in Primes._PRIMES.items():
             num = Primes.random_int(bits)
-            prime = Primes.get_closest(bits=bits)
             self.assertIsInstance(num, int)
             self.assertLess(num, prime)
             self.assertLessEqual(num.bit_length(), bits)
 
+    def test_primes_random_ints(self):
+        for bits, prime in Primes._PRIMES.items():
+            nums = Primes.random_ints(bits, 3)
+            self.assertEqual(len(nums), 3)
+            for num in nums:
+                self.assertIsInstance(num, int)
+                self.assertLess(num, prime)
+                self.assertLessEqual(num.bit_length(), bits)
+
     def test_primes_random_bytes(self):
         bts = Primes.random_bytes(128)
         num = int.from_bytes(bts, 'big', signed=False)
@@ -96,3 +105,8 @@ class TestInvalidInputs(TestCase):
         self.assertRaises(ValueError, Primes.random_int, 127)
         # Too many bits
         self.assertRaises(ValueError, Primes.random_int, 8193)
+
+    def test_random_ints(self):
+        self.assertRaises(ValueError, Primes.random_ints, 127, 2)
+        self.assertRaises(ValueError, Primes.random_ints, 8193, 2)
+        self.assertRaises(ValueError, Primes.random_ints, 128, 0)
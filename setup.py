@@ -51,6 +51,9 @@ setup(
     install_requires=[
         'hc-passphrase',
     ],
+    extras_require={
+        'gmpy2': ['gmpy2'],
+    },
     test_suite='nose.collector',
     tests_require=['nose'],
     zip_safe=False,